@@ -5,16 +5,468 @@ import argparse
 from pathlib import Path
 import shutil
 import tempfile
+import threading
 import ast
 import json
 import re
-from typing import Dict, List, Set, Tuple, Optional, Union, Any
+import hashlib
+import heapq
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Tuple, Optional, Union, Any, Iterable, Iterator
 from collections import defaultdict, Counter
+from itertools import chain
+from operator import itemgetter
+
+try:
+    import orjson  # Optional: much faster JSON serialization
+except ImportError:
+    orjson = None
+
+def _analyzer_fingerprint() -> str:
+    """Fingerprint of this module's source so cached results expire when the analysis changes."""
+    try:
+        with open(__file__, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return 'unknown'
+
+class SourceCodeCache:
+    """On-disk cache of pickled analysis results keyed by content hash."""
+    
+    max_bytes = 512 << 20
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        if cache_dir is None:
+            cache_root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            cache_dir = os.path.join(cache_root, 'repo_to_llm')
+        analyzer = _analyzer_fingerprint()
+        self.fingerprint = f"{sys.version_info[0]}.{sys.version_info[1]}:{analyzer}"
+        # One directory per Python version and analyzer, so prune() can drop stale ones whole
+        self.root = Path(cache_dir)
+        self.cache_dir = self.root / f"py{sys.version_info[0]}{sys.version_info[1]}-{analyzer}"
+        self.hits = 0
+        self.misses = 0
+        
+    def key(self, *parts: Union[str, bytes]) -> str:
+        """Build a cache key from the Python version, analyzer source and the given parts."""
+        digest = hashlib.sha256(self.fingerprint.encode())
+        for part in parts:
+            digest.update(b'\0')
+            digest.update(part if isinstance(part, bytes) else part.encode('utf-8'))
+        return digest.hexdigest()
+        
+    def get(self, key: str) -> Any:
+        """Return the cached value for key, or None on a miss."""
+        path = self.cache_dir / f"{key}.pkl"
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception:
+            return None
+        # Recently used entries are the last to be pruned
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+            
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key; failures only cost a future cache miss."""
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # Atomic so concurrent workers never observe a partial entry
+            os.replace(tmp_path, self.cache_dir / f"{key}.pkl")
+        except Exception:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                    
+    def prune(self) -> None:
+        """Drop entries of other Python versions or analyzer revisions, then the least recently used beyond max_bytes."""
+        try:
+            for entry in os.scandir(self.root):
+                if entry.name == self.cache_dir.name:
+                    continue
+                if entry.is_dir(follow_symlinks=False) and entry.name.startswith('py'):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                elif entry.name.endswith(('.pkl', '.tmp')):
+                    # Flat layout of earlier versions
+                    os.unlink(entry.path)
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                entry_stat = entry.stat(follow_symlinks=False)
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+        except OSError:
+            return
+            
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+class FileInfo:
+    """Analysis result for a single file; fields an extractor didn't produce stay None."""
+    __slots__ = ('path', 'size', 'extension', 'classes', 'functions', 'imports', 'configs',
+                 'defined_names', 'referenced_names', 'generated', 'error')
+    
+    def __init__(self, path: str, size: Optional[int] = None, extension: Optional[str] = None):
+        self.path = path
+        self.size = size
+        self.extension = extension
+        for name in self.__slots__[3:]:
+            setattr(self, name, None)
+            
+    def update(self, fields: dict) -> None:
+        """Set fields from an extractor result dict."""
+        for name, value in fields.items():
+            setattr(self, name, value)
+            
+    def to_dict(self) -> dict:
+        """Plain dict of the populated fields, for serialization."""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+def _json_default(obj: Any) -> Any:
+    """Serialize the analysis objects that json/orjson don't support natively."""
+    if isinstance(obj, FileInfo):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _as_text(content: Union[str, bytes]) -> str:
+    """Decode file content for the regex extractors."""
+    if isinstance(content, bytes):
+        # Undecodable bytes shouldn't cost the whole file its summary
+        return content.decode('utf-8', errors='replace')
+    return content
+
+_JS_TS_EXTENSIONS = frozenset({'.js', '.ts', '.jsx', '.tsx'})
+
+# JavaScript/TypeScript extraction patterns, compiled once at import time.
+# Functions, classes and imports share one alternation so each file is scanned
+# once; match.lastgroup names the outer group of the alternative that matched.
+_JS_SYMBOL_RE = re.compile('|'.join((
+    r'(?P<func>(?:function|const|let|var)\s+(?P<func_name>\w+)\s*(?:\([^)]*\)|\s*=\s*(?:\([^)]*\)|\([^)]*\)\s*=>))\s*(?::\s*(?P<func_type>[A-Za-z<>\[\]|, ]+))?\s*{)',
+    r'(?P<cls>class\s+(?P<cls_name>\w+)(?:\s+extends\s+(?P<cls_parent>\w+))?\s*{)',
+    r'(?P<imp>import\s+(?:{[^}]+}|[^{]+)\s+from\s+[\'"](?P<imp_module>.+?)[\'"])',
+)))
+_JS_METHOD_RE = re.compile(r'(?:async\s+)?(\w+)\s*\([^)]*\)(?:\s*:\s*([A-Za-z<>\[\]|, ]+))?\s*{')
+_JS_CONFIG_RE = re.compile(r'(?:const|let|var)\s+(CONFIG_\w+|[A-Z_]+)\s*=\s*({[^;]+}|[^;]+);')
+_JS_OBJECT_KEY_RE = re.compile(r'(\w+):')
+# Function declarations whose body _infer_js_return_type scans, and the returns within it
+_JS_FUNC_DECL_RE = re.compile(r'(?:function|const|let|var)\s+(\w+)\s*\([^)]*\)')
+_JS_RETURN_RE = re.compile(r'return\s+([^;]+);')
+_BRACE_RE = re.compile(r'[{}]')
+
+def _find_closing_brace(content: str, start: int, depth: int = 1) -> int:
+    """Return the index of the '}' that brings depth open braces at start to zero, or -1."""
+    # The regex engine hops between braces instead of stepping through every character in Python
+    for match in _BRACE_RE.finditer(content, start):
+        if match.group() == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return -1
+
+def _match_module(name: str, modules) -> Optional[str]:
+    """Return the longest dotted prefix of name (possibly name itself) found in modules, or None."""
+    while name not in modules:
+        dot = name.rfind('.')
+        if dot < 0:
+            return None
+        name = name[:dot]
+    return name
+
+# Fallback patterns for other languages, each with the keywords it cannot match without
+_GENERIC_FUNC_RE = re.compile(r'(?:function|def|func|void|int|string|bool)\s+(\w+)\s*\([^)]*\)')
+_GENERIC_CLASS_RE = re.compile(r'(?:class|struct|interface)\s+(\w+)')
+_GENERIC_CLASS_KEYWORDS = ('class', 'struct', 'interface')
+_GENERIC_IMPORT_RES = (
+    (('import', 'include', 'require'), re.compile(r'(?:import|include|require)\s+[\'"<](.+?)[\'">]')),  # C++, Go, etc.
+    (('import', 'from'), re.compile(r'(?:import|from)\s+(\S+)')),  # Various languages
+    (('use', 'using'), re.compile(r'(?:use|using)\s+(\S+);')),  # PHP, C#, etc.
+)
+
+# Recurring code patterns, scanned in a single pass per file. All are anchored to
+# lines and use negated classes instead of DOTALL .*? spans, so the scan stays
+# linear on large or minified files rather than backtracking across the file.
+_PY_PATTERNS = (
+    ('main_guard', rb'^if\s+__name__\s*==\s*[\'"]__main__[\'"]\s*:'),
+    ('try_except', rb'^[ \t]*except\b[^\n]*:'),
+    ('with_context', rb'^[ \t]*(?:async[ \t]+)?with[ \t][^\n]*\bas[ \t][^\n]*:'),
+    ('decorated_function', rb'^[ \t]*@[^\n]*\n(?:[ \t]*@[^\n]*\n)*[ \t]*(?:async[ \t]+)?def\s'),
+    ('for_loop', rb'^[ \t]*(?:async[ \t]+)?for[ \t][^\n]*[ \t]in[ \t][^\n]*:'),
+)
+_JS_PATTERNS = (
+    ('arrow_function', rb'\bconst\s+\w+\s*=\s*\(\)\s*=>\s*{'),
+    ('react_use_effect', rb'\buseEffect\(\s*\(\)\s*=>'),
+    ('react_use_state', rb'\buseState\('),
+    ('async_function', rb'\basync\s+function\b'),
+    ('try_catch', rb'}\s*catch\s*[({]'),
+)
+
+def _compile_patterns(patterns: Tuple[Tuple[str, bytes], ...]) -> 're.Pattern':
+    """Union (name, pattern) pairs into one alternation of named groups."""
+    return re.compile(b'|'.join(b'(?P<%s>%s)' % (name.encode(), p) for name, p in patterns), re.MULTILINE)
+
+_PY_PATTERN_NAMES = [name for name, _ in _PY_PATTERNS]
+_PY_PATTERNS_RE = _compile_patterns(_PY_PATTERNS)
+_JS_PATTERN_NAMES = [name for name, _ in _JS_PATTERNS]
+_JS_PATTERNS_RE = _compile_patterns(_JS_PATTERNS)
+
+# Converter used by pool workers, installed once per process by _init_worker
+_worker_converter = None
+
+def _init_worker(converter: 'EnhancedRepoToLLM') -> None:
+    """Install the converter configuration in a pool worker process."""
+    global _worker_converter
+    _worker_converter = converter
+
+def _analyze_file_worker(job: Tuple[str, str, os.stat_result]) -> Tuple[FileInfo, List[str], Optional[bool]]:
+    """Analyze one (path, relative path, stat) job inside a pool worker process."""
+    path, relative_path, file_stat = job
+    return _worker_converter._analyze_file(Path(path), relative_path, file_stat)
+
+# Literal config values kept by _SummaryVisitor; all of them serialize to JSON
+_CONFIG_LITERAL_TYPES = (str, int, float, bool, type(None))
+# Python 3.7 still parses literals into these instead of ast.Constant
+_LEGACY_LITERAL_NODES = () if sys.version_info >= (3, 8) else (ast.Str, ast.Num, ast.NameConstant)
+_NOT_LITERAL = object()
+
+def _literal_value(node: ast.AST) -> Any:
+    """Return the value of a string, number, bool or None literal node, or _NOT_LITERAL."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+    elif isinstance(node, _LEGACY_LITERAL_NODES):
+        value = ast.literal_eval(node)
+    else:
+        return _NOT_LITERAL
+    return value if isinstance(value, _CONFIG_LITERAL_TYPES) else _NOT_LITERAL
+
+class _SummaryVisitor:
+    """Collect the extract_python_info summary in one pass over the AST, without recursion."""
+    
+    def __init__(self, converter: 'EnhancedRepoToLLM'):
+        self.converter = converter
+        # (depth, entry) pairs, or (depth, name, value) for configs
+        self.classes = []
+        self.functions = []
+        self.imports = []
+        self.configs = []
+        self._depth = 0
+        
+        # Track names for reference counting
+        self.defined_names = set()
+        self.referenced_names = set()
+        
+        # Methods are summarized with their class, not as top-level functions
+        self._class_depth = 0
+        
+        # Return values of each enclosing function, innermost last
+        self._func_stack = []
+        self._method_return_types = {}
+        
+    def visit(self, tree: ast.AST) -> None:
+        """Visit every node of tree in preorder; a visit_ method may return a callback run after its children."""
+        stack = [(0, tree)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            depth, node = pop()
+            if depth is None:
+                node()
+                continue
+            self._depth = depth
+            method = getattr(self, 'visit_' + node.__class__.__name__, None)
+            if method is not None:
+                leave = method(node)
+                if leave is not None:
+                    push((None, leave))
+            children = []
+            for _, value in ast.iter_fields(node):
+                if isinstance(value, list):
+                    children.extend(item for item in value if isinstance(item, ast.AST))
+                elif isinstance(value, ast.AST):
+                    children.append(value)
+            depth += 1
+            for child in reversed(children):
+                push((depth, child))
+        
+    def summary(self) -> dict:
+        """The collected summary, in the order ast.walk would have found it."""
+        by_depth = itemgetter(0)
+        configs = {}
+        for _, name, value in sorted(self.configs, key=by_depth):
+            configs[name] = value
+        return {
+            'classes': [entry for _, entry in sorted(self.classes, key=by_depth)],
+            'functions': [entry for _, entry in sorted(self.functions, key=by_depth)],
+            'imports': [entry for _, entry in sorted(self.imports, key=by_depth)],
+            'configs': configs,
+            'defined_names': list(self.defined_names),
+            'referenced_names': list(self.referenced_names)
+        }
+        
+    def visit_ClassDef(self, node: ast.ClassDef):
+        methods = []
+        self.classes.append((self._depth, {
+            'name': sys.intern(node.name),
+            'methods': methods,
+            'bases': [self.converter._extract_py_name(b) for b in node.bases],
+            'docstring': ast.get_docstring(node) or ''
+        }))
+        self.defined_names.add(node.name)
+        self._class_depth += 1
+        
+        def leave():
+            self._class_depth -= 1
+            for f in node.body:
+                if isinstance(f, ast.FunctionDef):
+                    methods.append({
+                        'name': sys.intern(f.name),
+                        'return_type': self._method_return_types.pop(f)
+                    })
+        return leave
+        
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        info = None
+        if node.name != '__init__':
+            if not self._class_depth:
+                info = {
+                    'name': sys.intern(node.name),
+                    'args': [self.converter._extract_py_arg(arg) for arg in node.args.args],
+                    'return_type': None,
+                    'docstring': ast.get_docstring(node) or ''
+                }
+                self.functions.append((self._depth, info))
+            self.defined_names.add(node.name)
+            
+        self._func_stack.append([])
+        class_depth = self._class_depth
+        
+        def leave():
+            return_type = self.converter._extract_py_return_type(node, self._func_stack.pop())
+            if info is not None:
+                info['return_type'] = return_type
+            elif class_depth:
+                self._method_return_types[node] = return_type
+        return leave
+            
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        # Not summarized, but its returns are its own, as for a nested def
+        self._func_stack.append([])
+        return self._func_stack.pop
+            
+    def visit_Return(self, node: ast.Return) -> None:
+        value = node.value
+        if self._func_stack and value:
+            return_values = self._func_stack[-1]
+            if isinstance(value, ast.Name):
+                return_values.append(value.id)
+            elif isinstance(value, ast.Constant):
+                return_values.append(type(value.value).__name__)
+            elif isinstance(value, ast.List):
+                return_values.append('list')
+            elif isinstance(value, ast.Dict):
+                return_values.append('dict')
+            elif isinstance(value, ast.Call):
+                if isinstance(value.func, ast.Name):
+                    return_values.append(value.func.id)
+        
+    def visit_Import(self, node: ast.Import) -> None:
+        # Interned: the same module names recur across most files of a repository
+        for n in node.names:
+            self.imports.append((self._depth, sys.intern(n.name)))
+            if n.asname:
+                self.referenced_names.add(n.asname)
+            else:
+                self.referenced_names.add(n.name.split('.')[0])
+                
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = node.module or ''
+        for n in node.names:
+            import_name = f"{module}.{n.name}" if module else n.name
+            self.imports.append((self._depth, sys.intern(import_name)))
+            if n.asname:
+                self.referenced_names.add(n.asname)
+            else:
+                self.referenced_names.add(n.name)
+                
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self.referenced_names.add(node.id)
+            
+    def visit_Assign(self, node: ast.Assign) -> None:
+        # Extract config variables
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                name = target.id
+                if name.isupper() or name.startswith('CONFIG_'):
+                    # Literal nodes already hold their value; no need to evaluate them
+                    value = _literal_value(node.value)
+                    if value is not _NOT_LITERAL:
+                        self.configs.append((self._depth, name, value))
+                    elif isinstance(node.value, ast.Dict):
+                        config_dict = {}
+                        for key, value_node in zip(node.value.keys, node.value.values):
+                            # key is None for **mapping entries
+                            key_str = _literal_value(key) if key is not None else _NOT_LITERAL
+                            if isinstance(key_str, str):
+                                value = _literal_value(value_node)
+                                if value is not _NOT_LITERAL:
+                                    config_dict[key_str] = value
+                        self.configs.append((self._depth, name, config_dict))
 
 class EnhancedRepoToLLM:
+    # Below this many files the process pool costs more than it saves
+    parallel_threshold = 32
+    # Output files are written through a large buffer to coalesce small writes
+    output_buffer_size = 1 << 20
+    # JSON values nested this deep are records, each encoded in one piece (files are at depth 2)
+    json_record_depth = 3
+    # File tree emoji per extension, built once rather than on every lookup
+    _EMOJI_MAP = {
+        '.py': '🐍',
+        '.js': '📜',
+        '.ts': '📘',
+        '.jsx': '⚛️',
+        '.tsx': '⚛️',
+        '.html': '🌐',
+        '.css': '🎨',
+        '.json': '📋',
+        '.md': '📝',
+        '.java': '☕',
+        '.cpp': '⚙️',
+        '.h': '🔧',
+        '.go': '🏃',
+        '.rb': '💎',
+        '.php': '🐘'
+    }
+
     def __init__(self, repo_source: str, is_local: bool = False, max_depth: int = 4,
                  include_tree: bool = True, include_types: bool = True,
-                 include_dependencies: bool = True, include_patterns: bool = True):
+                 include_dependencies: bool = True, include_patterns: bool = True,
+                 workers: Optional[int] = None, use_cache: bool = True,
+                 cache_dir: Optional[str] = None, compact_json: bool = False):
         self.repo_source = repo_source
         self.is_local = is_local
         self.max_depth = max_depth
@@ -22,25 +474,44 @@ class EnhancedRepoToLLM:
         self.include_types = include_types
         self.include_dependencies = include_dependencies
         self.include_patterns = include_patterns
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = SourceCodeCache(cache_dir) if use_cache else None
+        self.compact_json = compact_json
         
         # Extract repo name
         if is_local:
-            self.repo_name = os.path.basename(os.path.abspath(repo_source))
-            self.repo_path = Path(repo_source)
+            self.repo_path = Path(repo_source).resolve()
+            self.repo_name = self.repo_path.name
         else:
-            self.repo_name = repo_source.rstrip('/').split('/')[-1].replace('.git', '')
+            # Only a trailing .git is a suffix to drop (str.removesuffix needs Python 3.9)
+            self.repo_name = repo_source.rstrip('/').rsplit('/', 1)[-1]
+            if self.repo_name.endswith('.git'):
+                self.repo_name = self.repo_name[:-4]
             self.temp_dir = tempfile.mkdtemp()
             self.repo_path = Path(self.temp_dir) / "repo"
         
         # Configuration
-        self.ignore_dirs = {'.git', '__pycache__', 'node_modules', 'venv', '.env', 'tests', 'test'}
-        self.ignore_files = {'requirements.txt', 'package.json', 'package-lock.json'}
-        self.code_extensions = {'.py', '.js', '.ts', '.java', '.cpp', '.h', '.jsx', '.tsx', '.rb', '.php', '.go'}
+        self.ignore_dirs = frozenset({'.git', '__pycache__', 'node_modules', 'venv', '.env', 'tests', 'test'})
+        self.ignore_files = frozenset({'requirements.txt', 'package.json', 'package-lock.json'})
+        self.code_extensions = frozenset({'.py', '.js', '.ts', '.java', '.cpp', '.h', '.jsx', '.tsx', '.rb', '.php', '.go'})
+        self.generated_suffixes = ('_pb2.py', '_pb2_grpc.py', '.min.js', '-bundle.js', '.bundle.js')
+        self.max_parse_bytes = 256 * 1024
+        
+        # Extractor per suffix, all called as extractor(content_bytes, relative_path).
+        # ast.parse decodes Python bytes itself, honouring PEP 263 coding declarations.
+        self._extractors = {'.py': self.extract_python_info}
+        for ext in _JS_TS_EXTENSIONS:
+            self._extractors[ext] = self.extract_js_ts_info
         
         # Analysis tracking
-        self.dependencies: Dict[str, Set[str]] = {}
-        self.reference_counts: Dict[str, int] = defaultdict(int)
+        # Dependencies as parallel lists: dep_imports[i] holds the imports of dep_paths[i]
+        self.dep_paths: List[str] = []
+        self.dep_imports: List[List[str]] = []
+        # References to each file's own definitions: reference_counts[path][name]
+        self.reference_counts: Dict[str, Counter] = defaultdict(Counter)
         self.patterns: Dict[str, List[str]] = {}
+        # Files importing each external dependency, counted by analyze_dependencies
+        self.external_dep_counts: Counter = Counter()
         self.semantic_units: Dict[str, List[Dict]] = defaultdict(list)
         self.file_tree: Dict = {}
         
@@ -53,134 +524,68 @@ class EnhancedRepoToLLM:
             self.clone_repo()
             
     def clone_repo(self):
-        """Clone repository with minimal depth."""
-        subprocess.run(['git', 'clone', '--depth', '1', self.repo_source, str(self.repo_path)], check=True)
+        """Clone repository with minimal depth, fetching and checking out only code files."""
+        # Large files tracked by Git LFS are never code worth summarizing: leave them as pointers
+        env = {**os.environ, 'GIT_LFS_SKIP_SMUDGE': '1'}
+        
+        # Partial clone: trees now, blobs only when the sparse checkout needs them.
+        # --depth already implies --single-branch; tags would only add refs to fetch.
+        try:
+            subprocess.run(['git', 'clone', '--depth', '1', '--no-tags', '--filter=blob:none', '--sparse',
+                            self.repo_source, str(self.repo_path)], env=env, check=True)
+        except subprocess.CalledProcessError:
+            # Git before 2.25 or a server without partial clone support: plain shallow clone
+            shutil.rmtree(self.repo_path, ignore_errors=True)
+            subprocess.run(['git', 'clone', '--depth', '1', self.repo_source, str(self.repo_path)],
+                           env=env, check=True)
+            return
+        
+        patterns = [f'*{ext}' for ext in sorted(self.code_extensions)]
+        patterns += [f'!**/{name}/**' for name in sorted(self.ignore_dirs)]
+        try:
+            subprocess.run(['git', '-C', str(self.repo_path), 'sparse-checkout', 'set', '--no-cone', *patterns],
+                           env=env, check=True)
+        except subprocess.CalledProcessError:
+            # Older git without non-cone support: fall back to a full checkout
+            subprocess.run(['git', '-C', str(self.repo_path), 'sparse-checkout', 'disable'], env=env, check=True)
 
     def should_process_file(self, path: Path) -> bool:
-        """Enhanced file filtering with improved logic."""
-        if path.name in self.ignore_files:
+        """Enhanced file filtering with improved logic; _walk applies the same checks inline."""
+        # Cheapest and most selective check first: most files aren't code
+        if path.suffix not in self.code_extensions:
             return False
             
-        if any(ignore in str(path) for ignore in self.ignore_dirs):
+        if path.name in self.ignore_files:
             return False
             
-        if path.suffix not in self.code_extensions:
+        try:
+            parts = path.relative_to(self.repo_path).parts
+        except ValueError:
+            parts = path.parts
+            
+        # Whole path components only, so e.g. contest.py is not mistaken for a test
+        if not self.ignore_dirs.isdisjoint(parts):
             return False
             
-        # Skip test files unless they're the main focus
-        if (any(part.lower().startswith('test') for part in path.parts) and
-            not all(part.lower().startswith('test') for part in self.repo_path.parts)):
+        # Skip test files and directories
+        if any(part.lower().startswith('test') for part in parts):
             return False
             
         return True
 
-    def extract_python_info(self, content: str, path: str) -> dict:
+    def extract_python_info(self, content: Union[str, bytes], path: str) -> dict:
         """Extract comprehensive information from Python files including return types."""
         try:
             tree = ast.parse(content)
-            classes = []
-            functions = []
-            imports = []
-            configs = {}
-            
-            # Track names for reference counting
-            defined_names = set()
-            referenced_names = set()
-            
-            for node in ast.walk(tree):
-                # Extract classes
-                if isinstance(node, ast.ClassDef):
-                    methods = []
-                    for f in node.body:
-                        if isinstance(f, ast.FunctionDef):
-                            return_type = self._extract_py_return_type(f)
-                            methods.append({
-                                'name': f.name,
-                                'return_type': return_type
-                            })
-                    bases = [self._extract_py_name(b) for b in node.bases]
-                    classes.append({
-                        'name': node.name,
-                        'methods': methods,
-                        'bases': bases,
-                        'docstring': ast.get_docstring(node) or ''
-                    })
-                    defined_names.add(node.name)
-                
-                # Extract functions
-                elif isinstance(node, ast.FunctionDef) and node.name != '__init__':
-                    return_type = self._extract_py_return_type(node)
-                    functions.append({
-                        'name': node.name,
-                        'args': [self._extract_py_arg(arg) for arg in node.args.args],
-                        'return_type': return_type,
-                        'docstring': ast.get_docstring(node) or ''
-                    })
-                    defined_names.add(node.name)
-                
-                # Extract imports
-                elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                    if isinstance(node, ast.Import):
-                        for n in node.names:
-                            imports.append(n.name)
-                            if n.asname:
-                                referenced_names.add(n.asname)
-                            else:
-                                referenced_names.add(n.name.split('.')[0])
-                    else:
-                        module = node.module or ''
-                        for n in node.names:
-                            import_name = f"{module}.{n.name}" if module else n.name
-                            imports.append(import_name)
-                            if n.asname:
-                                referenced_names.add(n.asname)
-                            else:
-                                referenced_names.add(n.name)
-                
-                # Extract name references
-                elif isinstance(node, ast.Name):
-                    if isinstance(node.ctx, ast.Load):
-                        referenced_names.add(node.id)
-                
-                # Extract config variables
-                elif isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name):
-                            name = target.id
-                            if name.isupper() or name.startswith('CONFIG_'):
-                                if isinstance(node.value, (ast.Str, ast.Num, ast.NameConstant)):
-                                    configs[name] = ast.literal_eval(node.value)
-                                elif isinstance(node.value, ast.Dict):
-                                    try:
-                                        config_dict = {}
-                                        for i, key in enumerate(node.value.keys):
-                                            if isinstance(key, ast.Str):
-                                                key_str = key.s
-                                                value = node.value.values[i]
-                                                if isinstance(value, (ast.Str, ast.Num, ast.NameConstant)):
-                                                    config_dict[key_str] = ast.literal_eval(value)
-                                        configs[name] = config_dict
-                                    except:
-                                        pass
-            
-            # Update reference counts
-            for name in referenced_names:
-                if name in defined_names:
-                    self.reference_counts[f"{path}:{name}"] += 1
-            
-            return {
-                'classes': classes,
-                'functions': functions,
-                'imports': imports,
-                'configs': configs,
-                'defined_names': list(defined_names),
-                'referenced_names': list(referenced_names)
-            }
         except SyntaxError:
             return {'error': 'Could not parse Python file'}
+            
+        visitor = _SummaryVisitor(self)
+        visitor.visit(tree)
+        return visitor.summary()
 
-    def _extract_py_return_type(self, func_node: ast.FunctionDef) -> str:
-        """Extract return type from Python function."""
+    def _extract_py_return_type(self, func_node: ast.FunctionDef, return_values: List[str]) -> str:
+        """Extract return type from Python function, given the kinds of value its body returns."""
         # Try to get from type annotation
         if func_node.returns:
             return self._extract_py_name(func_node.returns)
@@ -193,22 +598,7 @@ class EnhancedRepoToLLM:
             if match:
                 return match.group(1).strip()
         
-        # Look for return statements
-        return_values = []
-        for node in ast.walk(func_node):
-            if isinstance(node, ast.Return) and node.value:
-                if isinstance(node.value, ast.Name):
-                    return_values.append(node.value.id)
-                elif isinstance(node.value, ast.Constant):
-                    return_values.append(type(node.value.value).__name__)
-                elif isinstance(node.value, ast.List):
-                    return_values.append('list')
-                elif isinstance(node.value, ast.Dict):
-                    return_values.append('dict')
-                elif isinstance(node.value, ast.Call):
-                    if isinstance(node.value.func, ast.Name):
-                        return_values.append(node.value.func.id)
-        
+        # Fall back to the values of its return statements
         if return_values:
             if len(set(return_values)) == 1:
                 return return_values[0]
@@ -242,62 +632,54 @@ class EnhancedRepoToLLM:
             return str(node.value)
         return "unknown"
 
-    def extract_js_ts_info(self, content: str, path: str) -> dict:
+    def extract_js_ts_info(self, content: Union[str, bytes], path: str) -> dict:
         """Extract key information from JavaScript/TypeScript files with improved type analysis."""
-        # Simple regex-based extraction
+        content = _as_text(content)
+        # Single regex pass over the file for functions, classes and imports
         functions = []
-        function_matches = re.finditer(r'(?:function|const|let|var)\s+(\w+)\s*(?:\([^)]*\)|\s*=\s*(?:\([^)]*\)|\([^)]*\)\s*=>))\s*(?::\s*([A-Za-z<>\[\]|, ]+))?\s*{', content)
-        for match in function_matches:
-            func_name = match.group(1)
-            return_type = match.group(2) if match.group(2) else self._infer_js_return_type(content, func_name)
-            functions.append({
-                'name': func_name,
-                'return_type': return_type
-            })
-        
-        # Extract classes
         classes = []
-        class_matches = re.finditer(r'class\s+(\w+)(?:\s+extends\s+(\w+))?\s*{', content)
-        for match in class_matches:
-            class_name = match.group(1)
-            parent = match.group(2) if match.group(2) else None
-            
-            # Find methods in class
-            class_start = match.end()
-            brace_count = 1
-            class_content = ""
-            for i in range(class_start, len(content)):
-                if content[i] == '{':
-                    brace_count += 1
-                elif content[i] == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        class_content = content[class_start:i]
-                        break
-            
-            methods = []
-            method_matches = re.finditer(r'(?:async\s+)?(\w+)\s*\([^)]*\)(?:\s*:\s*([A-Za-z<>\[\]|, ]+))?\s*{', class_content)
-            for m_match in method_matches:
-                methods.append({
-                    'name': m_match.group(1),
-                    'return_type': m_match.group(2) if m_match.group(2) else 'any'
+        imports = []
+        # Where each function's declaration ends, found on first need with one scan
+        func_offsets = None
+        for match in _JS_SYMBOL_RE.finditer(content):
+            kind = match.lastgroup
+            if kind == 'func':
+                func_name = match.group('func_name')
+                return_type = match.group('func_type')
+                if not return_type:
+                    if func_offsets is None:
+                        func_offsets = {}
+                        for decl in _JS_FUNC_DECL_RE.finditer(content):
+                            func_offsets.setdefault(decl.group(1), decl.end())
+                    return_type = self._infer_js_return_type(content, func_name, func_offsets)
+                functions.append({
+                    'name': func_name,
+                    'return_type': return_type
                 })
+            elif kind == 'cls':
+                # Find methods in class
+                class_start = match.end()
+                class_end = _find_closing_brace(content, class_start)
+                class_content = content[class_start:class_end] if class_end >= 0 else ""
                 
-            classes.append({
-                'name': class_name,
-                'methods': methods,
-                'parent': parent
-            })
-        
-        # Extract imports
-        imports = []
-        import_matches = re.finditer(r'import\s+(?:{[^}]+}|[^{]+)\s+from\s+[\'"](.+?)[\'"]', content)
-        for match in import_matches:
-            imports.append(match.group(1))
+                methods = []
+                for m_match in _JS_METHOD_RE.finditer(class_content):
+                    methods.append({
+                        'name': m_match.group(1),
+                        'return_type': m_match.group(2) if m_match.group(2) else 'any'
+                    })
+                    
+                classes.append({
+                    'name': match.group('cls_name'),
+                    'methods': methods,
+                    'parent': match.group('cls_parent')
+                })
+            else:
+                imports.append(match.group('imp_module'))
             
         # Extract configs
         configs = {}
-        config_matches = re.finditer(r'(?:const|let|var)\s+(CONFIG_\w+|[A-Z_]+)\s*=\s*({[^;]+}|[^;]+);', content)
+        config_matches = _JS_CONFIG_RE.finditer(content)
         for match in config_matches:
             try:
                 name = match.group(1)
@@ -305,8 +687,8 @@ class EnhancedRepoToLLM:
                 value_str = match.group(2)
                 if value_str.startswith('{') and value_str.endswith('}'):
                     # Attempt to clean up and parse
-                    json_like = re.sub(r'(\w+):', r'"\1":', value_str)
-                    json_like = re.sub(r'\'', '"', json_like)
+                    json_like = _JS_OBJECT_KEY_RE.sub(r'"\1":', value_str)
+                    json_like = json_like.replace("'", '"')
                     try:
                         configs[name] = json.loads(json_like)
                     except:
@@ -332,35 +714,26 @@ class EnhancedRepoToLLM:
             'configs': configs
         }
 
-    def _infer_js_return_type(self, content: str, func_name: str) -> str:
-        """Infer JavaScript/TypeScript function return type."""
+    def _infer_js_return_type(self, content: str, func_name: str, func_offsets: Dict[str, int]) -> str:
+        """Infer JavaScript/TypeScript function return type; func_offsets maps names to the end of their declaration."""
         # Find the function
-        func_match = re.search(rf'(?:function|const|let|var)\s+{func_name}\s*\([^)]*\)', content)
-        if not func_match:
+        func_start = func_offsets.get(func_name)
+        if func_start is None:
             return 'any'
             
-        func_start = func_match.end()
         # Find the function body
-        brace_count = 0
-        func_body = ""
-        in_func = False
-        for i in range(func_start, len(content)):
-            if content[i] == '{':
-                brace_count += 1
-                if not in_func:
-                    in_func = True
-                    continue
-            elif content[i] == '}':
-                brace_count -= 1
-                if in_func and brace_count == 0:
-                    func_body = content[func_start:i]
-                    break
-        
-        if not func_body:
+        body_start = content.find('{', func_start)
+        if body_start < 0:
+            return 'any'
+        # Stray closing braces before the body still count against it
+        depth = 1 - content.count('}', func_start, body_start)
+        body_end = _find_closing_brace(content, body_start + 1, depth)
+        if body_end < 0:
             return 'any'
+        func_body = content[func_start:body_end]
             
         # Check return statements
-        return_matches = re.finditer(r'return\s+([^;]+);', func_body)
+        return_matches = _JS_RETURN_RE.finditer(func_body)
         return_types = []
         
         for match in return_matches:
@@ -390,96 +763,164 @@ class EnhancedRepoToLLM:
         else:
             return f"Union<{', '.join(set(return_types))}>"
 
-    def process_file(self, file_path: Path) -> dict:
+    def process_file(self, file_path: Path, relative_path: Optional[str] = None,
+                     file_stat: Optional[os.stat_result] = None) -> FileInfo:
         """Process a single file and extract its key information."""
+        file_info, patterns, cache_hit = self._analyze_file(file_path, relative_path, file_stat)
+        self._record_file(file_info, patterns, cache_hit)
+        return file_info
+
+    def _analyze_file(self, file_path: Path, relative_path: Optional[str] = None,
+                      file_stat: Optional[os.stat_result] = None) -> Tuple[FileInfo, List[str], Optional[bool]]:
+        """Return (file info, pattern names, cache hit or None) for a file without touching shared state."""
+        if relative_path is None:
+            try:
+                relative_path = file_path.resolve().relative_to(self.repo_path).as_posix()
+            except ValueError:
+                relative_path = file_path.as_posix()
+            
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
+            if file_stat is None:
+                file_stat = file_path.stat()
+                
+            # Extract file information based on extension
+            file_info = FileInfo(relative_path, file_stat.st_size, file_path.suffix)
             
-            relative_path = str(file_path.relative_to(self.repo_path))
+            # Generated code carries little signal; don't even read it
+            if file_path.name.endswith(self.generated_suffixes):
+                file_info.generated = True
+                return file_info, [], None
             
-            # Extract file information based on extension
-            file_info = {
-                'path': relative_path,
-                'size': file_path.stat().st_size,
-                'extension': file_path.suffix
-            }
+            oversized = file_info.size > self.max_parse_bytes
             
-            if file_path.suffix == '.py':
-                python_info = self.extract_python_info(content, relative_path)
-                file_info.update(python_info)
-                
-                # Add to semantic units
-                if 'classes' in python_info:
-                    for cls in python_info['classes']:
-                        self.semantic_units['classes'].append({
-                            'name': cls['name'],
-                            'file': relative_path,
-                            'docstring': cls.get('docstring', '')[:100]  # First 100 chars of docstring
-                        })
-                if 'functions' in python_info:
-                    for func in python_info['functions']:
-                        self.semantic_units['functions'].append({
-                            'name': func['name'],
-                            'file': relative_path,
-                            'return_type': func.get('return_type', 'Any'),
-                            'docstring': func.get('docstring', '')[:100]
-                        })
-                        
-            elif file_path.suffix in {'.js', '.ts', '.jsx', '.tsx'}:
-                js_info = self.extract_js_ts_info(content, relative_path)
-                file_info.update(js_info)
+            # Unchanged local files are recognized by path, mtime and size without being read
+            stat_key = cache_key = cached = None
+            if self.cache is not None and self.is_local:
+                stat_key = self.cache.key('stat', os.path.abspath(file_path), str(file_stat.st_mtime_ns),
+                                          str(file_info.size), str(self.include_patterns))
+                cached = self.cache.get(stat_key)
                 
-                # Add to semantic units
-                if 'classes' in js_info:
-                    for cls in js_info['classes']:
-                        self.semantic_units['classes'].append({
-                            'name': cls['name'],
-                            'file': relative_path
-                        })
-                if 'functions' in js_info:
-                    for func in js_info['functions']:
-                        self.semantic_units['functions'].append({
-                            'name': func['name'],
-                            'file': relative_path,
-                            'return_type': func.get('return_type', 'any')
-                        })
-            else:
-                # Basic extraction for other languages
-                simple_info = self._extract_generic_info(content)
-                file_info.update(simple_info)
-            
-            # Track dependencies
-            if 'imports' in file_info:
-                self.dependencies[relative_path] = set(file_info.get('imports', []))
+            if cached is None:
+                # Raw bytes in one unbuffered read; only the regex extractors need text
+                with open(file_path, 'rb', buffering=0) as f:
+                    content = f.read(file_info.size).strip()
+                    
+                # Reuse a previous analysis of identical content
+                if self.cache is not None:
+                    cache_key = self.cache.key(file_path.suffix, str(self.include_patterns), str(oversized), content)
+                    cached = self.cache.get(cache_key)
+                    if cached is not None and stat_key is not None:
+                        self.cache.put(stat_key, cached)
             
-            # Extract code patterns if enabled
-            if self.include_patterns:
-                self._extract_patterns(content, relative_path, file_path.suffix)
+            if cached is not None:
+                info, patterns = cached
+            else:
+                if oversized:
+                    # Too large to parse cheaply: use the streaming regex scan instead
+                    extractor = self._extract_generic_info
+                else:
+                    # Basic extraction for languages without a dedicated extractor
+                    extractor = self._extractors.get(file_path.suffix, self._extract_generic_info)
+                info = extractor(content, relative_path)
                 
-            return file_info
+                # Extract code patterns if enabled
+                patterns = self._extract_patterns(content, file_path.suffix) if self.include_patterns else []
+                
+                if cache_key is not None:
+                    self.cache.put(cache_key, (info, patterns))
+                if stat_key is not None:
+                    self.cache.put(stat_key, (info, patterns))
+                    
+            file_info.update(info)
+            return file_info, patterns, None if self.cache is None else cached is not None
             
         except Exception as e:
-            return {
-                'path': str(file_path.relative_to(self.repo_path)),
-                'error': str(e)
-            }
+            file_info = FileInfo(relative_path, file_stat.st_size if file_stat is not None else None,
+                                 file_path.suffix)
+            file_info.error = str(e)
+            return file_info, [], None
 
-    def _extract_generic_info(self, content: str) -> dict:
+    def _record_file(self, file_info: FileInfo, patterns: List[str], cache_hit: Optional[bool] = None) -> None:
+        """Merge the results of _analyze_file into the repository-wide tracking state."""
+        relative_path = file_info.path
+        extension = file_info.extension
+        
+        if cache_hit is not None:
+            if cache_hit:
+                self.cache.hits += 1
+            else:
+                self.cache.misses += 1
+        
+        # Add to semantic units; return types repeat a small set of names, interned here (like
+        # imports below) so every record shares one string per type
+        if extension == '.py':
+            for cls in file_info.classes or []:
+                self.semantic_units['classes'].append({
+                    'name': cls['name'],
+                    'file': relative_path,
+                    'docstring': cls.get('docstring', '')[:100]  # First 100 chars of docstring
+                })
+            for func in file_info.functions or []:
+                self.semantic_units['functions'].append({
+                    'name': func['name'],
+                    'file': relative_path,
+                    'return_type': sys.intern(func.get('return_type', 'Any')),
+                    'docstring': func.get('docstring', '')[:100]
+                })
+                
+            # Update reference counts
+            referenced = set(file_info.referenced_names or ()).intersection(file_info.defined_names or ())
+            if referenced:
+                self.reference_counts[relative_path].update(referenced)
+                    
+        elif extension in _JS_TS_EXTENSIONS:
+            for cls in file_info.classes or []:
+                self.semantic_units['classes'].append({
+                    'name': cls['name'],
+                    'file': relative_path
+                })
+            for func in file_info.functions or []:
+                self.semantic_units['functions'].append({
+                    'name': func['name'],
+                    'file': relative_path,
+                    'return_type': sys.intern(func.get('return_type', 'any'))
+                })
+        
+        # Track dependencies
+        if file_info.imports is not None:
+            self.dep_paths.append(relative_path)
+            # Order-preserving dedup without building a set per file; interned again here
+            # because results unpickled from pool workers arrive as fresh strings
+            self.dep_imports.append(list(dict.fromkeys(map(sys.intern, file_info.imports))))
+        
+        for name in patterns:
+            if name not in self.patterns:
+                self.patterns[name] = []
+            self.patterns[name].append(relative_path)
+
+    def _analyze_files(self, jobs: List[Tuple[str, str, os.stat_result]]):
+        """Yield _analyze_file results for (path, relative path, stat) jobs, in order, using a process pool for large repositories."""
+        if self.workers > 1 and len(jobs) >= self.parallel_threshold:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(self,)) as executor:
+                yield from executor.map(_analyze_file_worker, jobs, chunksize=16)
+        else:
+            for path, relative_path, file_stat in jobs:
+                yield self._analyze_file(Path(path), relative_path, file_stat)
+
+    def _extract_generic_info(self, content: Union[str, bytes], path: str = '') -> dict:
         """Extract basic information from non-Python/JS files."""
-        functions = re.findall(r'(?:function|def|func|void|int|string|bool)\s+(\w+)\s*\([^)]*\)', content)
-        classes = re.findall(r'(?:class|struct|interface)\s+(\w+)', content)
+        content = _as_text(content)
+        # Substring checks are C-level scans that rule out a regex pass when it can't match
+        functions = _GENERIC_FUNC_RE.findall(content) if '(' in content else []
+        classes = (_GENERIC_CLASS_RE.findall(content)
+                   if any(keyword in content for keyword in _GENERIC_CLASS_KEYWORDS) else [])
         imports = []
         
         # Try to find imports in various formats
-        import_patterns = [
-            r'(?:import|include|require)\s+[\'"<](.+?)[\'">]',  # C++, Go, etc.
-            r'(?:import|from)\s+(\S+)',  # Various languages
-            r'(?:use|using)\s+(\S+);'    # PHP, C#, etc.
-        ]
-        
-        for pattern in import_patterns:
-            imports.extend(re.findall(pattern, content))
+        for keywords, pattern in _GENERIC_IMPORT_RES:
+            if any(keyword in content for keyword in keywords):
+                imports.extend(pattern.findall(content))
         
         return {
             'functions': [{'name': f} for f in functions],
@@ -487,61 +928,77 @@ class EnhancedRepoToLLM:
             'imports': imports
         }
 
-    def _extract_patterns(self, content: str, file_path: str, extension: str) -> None:
-        """Extract recurring code patterns from files."""
+    def _extract_patterns(self, content: bytes, extension: str) -> List[str]:
+        """Extract names of recurring code patterns found in a file."""
         if extension == '.py':
-            # Find common Python patterns
-            patterns = [
-                (r'if\s+__name__\s*==\s*[\'"]__main__[\'"]:.*?(?=\n\S)', 'main_guard'),
-                (r'try:\s*.*?except.*?:\s*.*?(?=\n\S)', 'try_except'),
-                (r'with\s+.*?as\s+.*?:\s*.*?(?=\n\S)', 'with_context'),
-                (r'@.*?\ndef\s+.*?(?=\n\S)', 'decorated_function'),
-                (r'for\s+.*?\s+in\s+.*?:\s*.*?(?=\n\S)', 'for_loop')
-            ]
+            names, pattern = _PY_PATTERN_NAMES, _PY_PATTERNS_RE
         elif extension in {'.js', '.ts'}:
-            # Find common JS patterns
-            patterns = [
-                (r'const\s+.*?\s*=\s*\(\)\s*=>\s*{.*?};', 'arrow_function'),
-                (r'useEffect\(\(\)\s*=>\s*{.*?}\s*,\s*\[.*?\]\);', 'react_use_effect'),
-                (r'useState\(.*?\);', 'react_use_state'),
-                (r'async\s+function.*?{.*?}', 'async_function'),
-                (r'try\s*{.*?}\s*catch.*?{.*?}', 'try_catch')
-            ]
+            names, pattern = _JS_PATTERN_NAMES, _JS_PATTERNS_RE
         else:
-            return
+            return []
+            
+        # One scan for all patterns; only presence matters, so stop once all were seen
+        seen = set()
+        for match in pattern.finditer(content):
+            seen.add(match.lastgroup)
+            if len(seen) == len(names):
+                break
+        return [name for name in names if name in seen]
+
+    def _walk(self, root: Path):
+        """Yield (DirEntry, suffix, '/'-separated relative path) for code files under root, pruning ignored directories."""
+        root_str = str(root)
+        prefix_len = len(root_str) + len(os.sep)
+        code_extensions, ignore_files, ignore_dirs = self.code_extensions, self.ignore_files, self.ignore_dirs
+        stack = [root_str]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        # Skip test files and directories below the root
+                        if name.lower().startswith('test'):
+                            continue
+                        # Decide on the name first; the file type is only needed for candidates
+                        dot = name.rfind('.')
+                        suffix = name[dot:] if dot > 0 else ''
+                        if (suffix in code_extensions and name not in ignore_files
+                                and entry.is_file(follow_symlinks=False)):
+                            relative_path = entry.path[prefix_len:]
+                            if os.sep != '/':
+                                relative_path = relative_path.replace(os.sep, '/')
+                            yield entry, suffix, relative_path
+                        elif name not in ignore_dirs and entry.is_dir(follow_symlinks=False):
+                            # Ignored subtrees are pruned before descending into them
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _add_to_tree(self, tree: dict, relative_path: str) -> None:
+        """Insert a file into the hierarchical file tree."""
+        parts = relative_path.split('/')
+        
+        # Limit depth
+        if len(parts) > self.max_depth:
+            parts = parts[:self.max_depth] + ['...']
             
-        for pattern, name in patterns:
-            matches = re.findall(pattern, content, re.DOTALL)
-            if matches:
-                if name not in self.patterns:
-                    self.patterns[name] = []
-                self.patterns[name].append(file_path)
+        current = tree
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:  # File
+                if '_files' not in current:
+                    current['_files'] = []
+                current['_files'].append(part)
+            else:  # Directory
+                if part not in current:
+                    current[part] = {}
+                current = current[part]
 
     def build_file_tree(self) -> dict:
         """Build hierarchical file tree structure."""
         tree = {}
         
-        for path in self.repo_path.rglob('*'):
-            if not path.is_file() or not self.should_process_file(path):
-                continue
-                
-            relative_path = str(path.relative_to(self.repo_path))
-            parts = relative_path.split('/')
-            
-            # Limit depth
-            if len(parts) > self.max_depth:
-                parts = parts[:self.max_depth] + ['...']
-                
-            current = tree
-            for i, part in enumerate(parts):
-                if i == len(parts) - 1:  # File
-                    if '_files' not in current:
-                        current['_files'] = []
-                    current['_files'].append(part)
-                else:  # Directory
-                    if part not in current:
-                        current[part] = {}
-                    current = current[part]
+        for _, _, relative_path in self._walk(self.repo_path):
+            self._add_to_tree(tree, relative_path)
         
         # Compress tree by combining small directories
         self._optimize_tree(tree)
@@ -549,41 +1006,40 @@ class EnhancedRepoToLLM:
         
     def _optimize_tree(self, tree: dict) -> None:
         """Optimize tree by condensing small directories."""
-        # Bottom-up reduction
-        for key, value in list(tree.items()):
-            if isinstance(value, dict) and key != '_files':
-                self._optimize_tree(value)
-                # If directory has only one subdirectory, combine them
-                if len(value) == 1 and '_files' not in value:
-                    subdir = list(value.keys())[0]
-                    new_key = f"{key}/{subdir}"
-                    tree[new_key] = value[subdir]
-                    del tree[key]
+        # Bottom-up reduction: children are condensed first, so a whole chain of
+        # single-subdirectory levels collapses into one key in this single pass
+        subdirs = [key for key in tree if key != '_files']
+        for key in subdirs:
+            value = tree[key]
+            self._optimize_tree(value)
+            # If directory has only one subdirectory, combine them
+            if len(value) == 1 and '_files' not in value:
+                subdir, subtree = next(iter(value.items()))
+                tree[f"{key}/{subdir}"] = subtree
+                del tree[key]
 
     def analyze_dependencies(self) -> dict:
         """Build dependency graph and find key relationships."""
         internal_modules = set()
-        for path in self.dependencies.keys():
+        for path in self.dep_paths:
             module_name = path.split('.')[0].replace('/', '.')
             internal_modules.add(module_name)
         
         # Categorize dependencies
         dependency_graph = {}
-        for source, targets in self.dependencies.items():
+        self.external_dep_counts = Counter()
+        for source, targets in zip(self.dep_paths, self.dep_imports):
             internal_deps = []
             external_deps = []
             
             for target in targets:
-                is_internal = False
-                for module in internal_modules:
-                    if target.startswith(module) or target.replace('/', '.').startswith(module):
-                        is_internal = True
-                        internal_deps.append(target)
-                        break
-                        
-                if not is_internal:
+                # Hash probes of the target's dotted prefixes instead of a scan of every module
+                if _match_module(target.replace('/', '.'), internal_modules) is not None:
+                    internal_deps.append(target)
+                else:
                     external_deps.append(target)
                     
+            self.external_dep_counts.update(external_deps)
             dependency_graph[source] = {
                 'internal': internal_deps,
                 'external': external_deps
@@ -596,27 +1052,37 @@ class EnhancedRepoToLLM:
         component_scores = {}
         
         # Calculate scores based on references and dependency counts
-        for component, refs in self.reference_counts.items():
-            file_path = component.split(':')[0]
-            component_scores[file_path] = component_scores.get(file_path, 0) + refs
+        for file_path, refs in self.reference_counts.items():
+            component_scores[file_path] = sum(refs.values())
+            
+        # Map module names back to files once; the first file for a module wins
+        module_to_file = {}
+        for file_path in self.dep_paths:
+            module_to_file.setdefault(file_path.split('.')[0].replace('/', '.'), file_path)
             
         # Add scores for being imported
-        for source, deps in self.dependencies.items():
+        for deps in self.dep_imports:
             for dep in deps:
                 # Try to map dependency to file path
-                for file_path in self.dependencies.keys():
-                    module_name = file_path.split('.')[0].replace('/', '.')
-                    if dep.startswith(module_name):
-                        component_scores[file_path] = component_scores.get(file_path, 0) + 2
-                        break
+                module_name = _match_module(dep, module_to_file)
+                if module_name is not None:
+                    file_path = module_to_file[module_name]
+                    component_scores[file_path] = component_scores.get(file_path, 0) + 2
         
-        # Sort by score
-        key_components = sorted(component_scores.items(), key=lambda x: x[1], reverse=True)
-        return [k for k, v in key_components[:min(10, len(key_components))]]
+        # Top 10 by score; nlargest keeps ties in insertion order like a stable sort
+        key_components = heapq.nlargest(10, component_scores.items(), key=lambda x: x[1])
+        return [k for k, v in key_components]
 
     def analyze_structure(self) -> dict:
         """Analyze repository structure with enhanced metrics."""
-        structure = {
+        structure = self._new_structure()
+        for _ in self._iter_structure(structure):
+            pass
+        return structure
+        
+    def _new_structure(self) -> dict:
+        """Return the skeleton that _iter_structure fills in."""
+        return {
             'files': [],
             'summary': {
                 'total_files': 0,
@@ -626,23 +1092,38 @@ class EnhancedRepoToLLM:
             }
         }
         
-        # Build file tree if enabled
-        if self.include_tree:
-            self.file_tree = self.build_file_tree()
-            structure['file_tree'] = self.file_tree
+    def _iter_structure(self, structure: dict, keep_files: bool = True) -> Iterator[FileInfo]:
+        """Analyze the repository into structure, yielding each file's info; structure is complete once exhausted."""
+        # Collect files and build the file tree in a single walk
+        tree = {}
+        jobs = []
+        for entry, _, relative_path in self._walk(self.repo_path):
+            if self.include_tree:
+                self._add_to_tree(tree, relative_path)
+                
+            jobs.append((entry.path, relative_path, entry.stat(follow_symlinks=False)))
         
         # Process all files
-        for path in self.repo_path.rglob('*'):
-            if path.is_file() and self.should_process_file(path):
-                file_info = self.process_file(path)
+        sizes = []
+        extensions = []
+        for file_info, patterns, cache_hit in self._analyze_files(jobs):
+            self._record_file(file_info, patterns, cache_hit)
+            if keep_files:
                 structure['files'].append(file_info)
-                
-                # Update summary statistics
-                structure['summary']['total_files'] += 1
-                structure['summary']['total_size'] += file_info.get('size', 0)
-                ext = file_info.get('extension', '')
-                structure['summary']['language_distribution'][ext] = \
-                    structure['summary']['language_distribution'].get(ext, 0) + 1
+            sizes.append(file_info.size or 0)
+            extensions.append(sys.intern(file_info.extension or ''))
+            yield file_info
+        
+        # Reduce summary statistics in bulk rather than per file
+        structure['summary']['total_files'] = len(sizes)
+        structure['summary']['total_size'] = sum(sizes)
+        structure['summary']['language_distribution'] = dict(Counter(extensions))
+        
+        # Add file tree if enabled
+        if self.include_tree:
+            self._optimize_tree(tree)
+            self.file_tree = tree
+            structure['file_tree'] = self.file_tree
         
         # Add dependency information if enabled
         if self.include_dependencies:
@@ -657,21 +1138,23 @@ class EnhancedRepoToLLM:
         
         # Identify key components
         structure['summary']['key_components'] = self.identify_key_components()
-        
-        return structure
 
     def generate_tree_markdown(self, tree: dict, indent: int = 0) -> str:
         """Generate Markdown representation of file tree."""
-        result = []
+        return '\n'.join(self._iter_tree_lines(tree, indent))
+        
+    def _iter_tree_lines(self, tree: dict, indent: int):
+        """Yield the lines of generate_tree_markdown, so subtrees aren't joined level by level."""
+        pad = ' ' * indent
         
         # Process directories
         for key, value in sorted(tree.items()):
             if key == '_files':
                 continue
                 
-            result.append(f"{' ' * indent}* 📁 {key}")
+            yield f"{pad}* 📁 {key}"
             if isinstance(value, dict):
-                result.append(self.generate_tree_markdown(value, indent + 2))
+                yield from self._iter_tree_lines(value, indent + 2)
                 
         # Process files in current directory
         if '_files' in tree:
@@ -686,132 +1169,279 @@ class EnhancedRepoToLLM:
                 # Too many files, summarize
                 for ext, files_list in by_ext.items():
                     emoji = self._get_file_emoji(ext)
-                    result.append(f"{' ' * indent}* {emoji} {len(files_list)} {ext} files")
+                    yield f"{pad}* {emoji} {len(files_list)} {ext} files"
             else:
                 # Show all files
                 for file in files:
                     ext = os.path.splitext(file)[1]
                     emoji = self._get_file_emoji(ext)
-                    result.append(f"{' ' * indent}* {emoji} {file}")
+                    yield f"{pad}* {emoji} {file}"
                     
-        return '\n'.join(result)
-        
     def _get_file_emoji(self, extension: str) -> str:
         """Get emoji for file based on extension."""
-        emoji_map = {
-            '.py': '🐍',
-            '.js': '📜',
-            '.ts': '📘',
-            '.jsx': '⚛️',
-            '.tsx': '⚛️',
-            '.html': '🌐',
-            '.css': '🎨',
-            '.json': '📋',
-            '.md': '📝',
-            '.java': '☕',
-            '.cpp': '⚙️',
-            '.h': '🔧',
-            '.go': '🏃',
-            '.rb': '💎',
-            '.php': '🐘'
-        }
-        return emoji_map.get(extension, '📄')
+        return self._EMOJI_MAP.get(extension, '📄')
+
+    def _remote_head_sha(self) -> Optional[str]:
+        """Resolve the remote HEAD commit without cloning, or None if unavailable."""
+        try:
+            result = subprocess.run(['git', 'ls-remote', self.repo_source, 'HEAD'],
+                                    capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        fields = result.stdout.split()
+        return fields[0] if fields else None
+
+    def _cloned_head_sha(self) -> Optional[str]:
+        """Resolve the commit checked out in the clone, or None if unavailable."""
+        try:
+            result = subprocess.run(['git', '-C', str(self.repo_path), 'rev-parse', 'HEAD'],
+                                    capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout.strip() or None
+
+    def _repo_cache_key(self, cloned: bool = False) -> Optional[str]:
+        """Cache key for a whole remote repository's structure, keyed on the remote's or the clone's HEAD commit."""
+        if self.cache is None or self.is_local:
+            return None
+        sha = self._cloned_head_sha() if cloned else self._remote_head_sha()
+        if sha is None:
+            return None
+        options = (self.max_depth, self.include_tree, self.include_types,
+                   self.include_dependencies, self.include_patterns)
+        return self.cache.key('repo', self.repo_source, sha, repr(options))
+
+    def _write_json(self, structure: dict, json_filename: str,
+                    files: Optional[Iterable[FileInfo]] = None) -> None:
+        """Write the structure as JSON one record at a time, taking files (if given) for structure['files']."""
+        def entries():
+            yield 'files', iter(files)
+            for key, value in structure.items():
+                if key != 'files':
+                    yield key, value
+                    
+        tmp_filename = f"{json_filename}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_filename, 'wb', buffering=self.output_buffer_size) as f:
+                if files is None:
+                    self._write_json_value(f, structure, 0)
+                else:
+                    self._write_json_container(f, entries(), True, 0)
+            os.replace(tmp_filename, json_filename)
+        except BaseException:
+            try:
+                os.unlink(tmp_filename)
+            except OSError:
+                pass
+            raise
+            
+    def _write_json_value(self, f, value: Any, depth: int) -> None:
+        """Write value, nested depth levels deep, streaming containers above the record level."""
+        is_dict = isinstance(value, dict)
+        if depth >= self.json_record_depth or not (is_dict or isinstance(value, (list, Iterator))):
+            f.write(self._encode_json(value, depth))
+        else:
+            self._write_json_container(f, value.items() if is_dict else value, is_dict, depth)
+            
+    def _write_json_container(self, f, items: Iterable, is_dict: bool, depth: int) -> None:
+        """Write an object from (key, value) items, or an array from values, as they are produced."""
+        if self.compact_json:
+            newline, closing, key_sep = b'', b'', b':'
+        else:
+            newline = b'\n' + b'  ' * (depth + 1)
+            closing = b'\n' + b'  ' * depth
+            key_sep = b': '
+            
+        f.write(b'{' if is_dict else b'[')
+        empty = True
+        for item in items:
+            f.write(newline if empty else b',' + newline)
+            empty = False
+            if is_dict:
+                key, item = item
+                f.write(self._encode_json(key, 0) + key_sep)
+            self._write_json_value(f, item, depth + 1)
+        if not empty:
+            f.write(closing)
+        f.write(b'}' if is_dict else b']')
+        
+    def _encode_json(self, value: Any, depth: int) -> bytes:
+        """Encode one record, indented to sit depth levels deep; orjson is used when installed."""
+        data = None
+        if orjson is not None:
+            # Non-string keys are written as strings, as the stdlib json module does
+            option = orjson.OPT_NON_STR_KEYS
+            if not self.compact_json:
+                option |= orjson.OPT_INDENT_2
+            try:
+                data = orjson.dumps(value, default=_json_default, option=option)
+            except TypeError:
+                # e.g. integers beyond 64 bits in extracted configs; stdlib json handles them
+                pass
+        if data is None:
+            ensure_ascii = orjson is None
+            if self.compact_json:
+                data = json.dumps(value, separators=(',', ':'), ensure_ascii=ensure_ascii,
+                                  default=_json_default).encode('utf-8')
+            else:
+                data = json.dumps(value, indent=2, ensure_ascii=ensure_ascii,
+                                  default=_json_default).encode('utf-8')
+        if depth and not self.compact_json:
+            data = data.replace(b'\n', b'\n' + b'  ' * depth)
+        return data
+
+    def _write_markdown(self, structure: dict, md_filename: str, reused: bool = False) -> None:
+        """Write the human-readable markdown summary; reused means structure came from the repository cache."""
+        summary = structure['summary']
+        semantic_units = structure['semantic_units']
+        
+        # (heading, lines, placeholder); empty sections without a placeholder are skipped
+        sections = [(
+            "## Language Distribution\n",
+            # Most used first; ties keep the order the extensions were first seen in
+            [f"- {lang or 'no extension'}: {count} files\n"
+             for lang, count in sorted(summary['language_distribution'].items(),
+                                       key=itemgetter(1), reverse=True)],
+            None
+        )]
+        
+        # File tree if available; streamed line by line so the rendered tree never exists as one string
+        if self.include_tree and 'file_tree' in structure:
+            sections.append((
+                "## File Tree\n",
+                (f"{line}\n" for line in self._iter_tree_lines(structure['file_tree'], 0)),
+                None
+            ))
+            
+        sections.append((
+            "## Key Components\nThese files appear to be central to the codebase:\n",
+            [f"- `{component}`\n" for component in summary['key_components']],
+            None
+        ))
+        
+        # Semantic units - classes and functions
+        class_lines = []
+        # A bounded heap instead of sorting every class; same result as sorted()[:10]
+        for cls in heapq.nsmallest(10, semantic_units.get('classes', ()),
+                                   key=lambda x: x.get('name', '')):  # Top 10 classes
+            # Only the first 60 characters can be shown, so only those are normalized
+            raw_doc = cls.get('docstring') or ''
+            doc = raw_doc[:60].replace('\n', ' ')
+            if len(raw_doc) > 60:
+                doc = doc[:57] + '...'
+            class_lines.append(f"- `{cls['name']}` - {doc}\n")
+        sections.append(("## Core Classes\n", class_lines, "No major classes identified\n"))
+        
+        # Sort by return type for better organization
+        funcs = heapq.nsmallest(15, semantic_units.get('functions', ()),
+                                key=lambda x: (x.get('return_type', 'Any'), x.get('name', '')))  # Top 15 functions
+        sections.append((
+            "## Core Functions\n",
+            [f"- `{func['name']}` → `{func.get('return_type', 'Any')}`\n" for func in funcs],
+            "No major functions identified\n"
+        ))
+        
+        # Code patterns if available
+        if self.include_patterns and structure.get('patterns'):
+            sections.append((
+                "## Common Code Patterns\n",
+                [f"- **{pattern}** - Used in {len(files)} files\n"
+                 for pattern, files in structure['patterns'].items()],
+                None
+            ))
+            
+        # Dependencies if available
+        if self.include_dependencies and structure.get('dependencies'):
+            # Counted while the dependencies were categorized, unless they come from the cache
+            ext_deps = self.external_dep_counts
+            if reused:
+                ext_deps = Counter(chain.from_iterable(file_deps.get('external', ())
+                                                       for file_deps in structure['dependencies'].values()))
+            sections.append((
+                "## External Dependencies\n",
+                [f"- `{dep}` - Used in {count} files\n"
+                 for dep, count in ext_deps.most_common(10)],  # Top 10 external dependencies
+                None
+            ))
+            
+        # Each section reaches the buffer in one writelines call
+        with open(md_filename, 'w', encoding='utf-8', buffering=self.output_buffer_size) as f:
+            f.writelines([
+                f"# {self.repo_name} Repository Summary\n\n",
+                "## Overview\n",
+                f"- **Total Files:** {summary['total_files']}\n",
+                f"- **Total Size:** {summary['total_size'] / 1024:.2f} KB\n\n",
+            ])
+            for heading, lines, placeholder in sections:
+                lines = iter(lines)
+                first = next(lines, None)
+                if first is None:
+                    if placeholder is not None:
+                        f.writelines((heading, placeholder, "\n"))
+                    continue
+                f.writelines((heading, first))
+                f.writelines(lines)
+                f.write("\n")
 
     def convert(self) -> None:
         """Main conversion process with enhanced output."""
         try:
-            self.setup_repo()
-            structure = self.analyze_structure()
+            # A repeated URL at the same commit needs neither a clone nor an analysis
+            repo_key = self._repo_cache_key()
+            structure = self.cache.get(repo_key) if repo_key else None
+            reused = structure is not None
             
             # Generate output filenames
             json_filename = f"{self.repo_name}_summary.json"
             md_filename = f"{self.repo_name}_summary.md"
             
             # Save the structured JSON output
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(structure, f, indent=2)
+            if structure is None:
+                self.setup_repo()
+                # Analyze while writing: each file's record is written as soon as it's ready and
+                # only kept if the repository cache needs the complete structure
+                structure = self._new_structure()
+                self._write_json(structure, json_filename,
+                                 self._iter_structure(structure, keep_files=bool(repo_key)))
+                put_key = self._repo_cache_key(cloned=True) if repo_key else None
+                if put_key:
+                    self.cache.put(put_key, structure)
+            else:
+                self._write_json(structure, json_filename)
+            # The per-file records are the bulk of the structure and only the JSON needed them;
+            # freeing them now keeps them out of memory while the markdown is written
+            structure['files'] = []
                 
             # Create a markdown summary for human readability
-            with open(md_filename, 'w', encoding='utf-8') as f:
-                f.write(f"# {self.repo_name} Repository Summary\n\n")
-                
-                # Overview section
-                f.write(f"## Overview\n")
-                f.write(f"- **Total Files:** {structure['summary']['total_files']}\n")
-                f.write(f"- **Total Size:** {structure['summary']['total_size'] / 1024:.2f} KB\n\n")
-                
-                # Language distribution
-                f.write("## Language Distribution\n")
-                for lang, count in structure['summary']['language_distribution'].items():
-                    f.write(f"- {lang or 'no extension'}: {count} files\n")
-                f.write("\n")
-                
-                # File tree if available
-                if self.include_tree and 'file_tree' in structure:
-                    f.write("## File Tree\n")
-                    f.write(self.generate_tree_markdown(structure['file_tree']))
-                    f.write("\n\n")
-                
-                # Key components
-                f.write("## Key Components\n")
-                f.write("These files appear to be central to the codebase:\n")
-                for component in structure['summary']['key_components']:
-                    f.write(f"- `{component}`\n")
-                f.write("\n")
-                
-                # Semantic units - classes and functions
-                f.write("## Core Classes\n")
-                if structure['semantic_units'].get('classes'):
-                    classes = sorted(structure['semantic_units']['classes'],
-                                   key=lambda x: x.get('name', ''))[:10]  # Top 10 classes
-                    for cls in classes:
-                        doc = cls.get('docstring', '').replace('\n', ' ')
-                        if len(doc) > 60:
-                            doc = doc[:57] + '...'
-                        f.write(f"- `{cls['name']}` - {doc}\n")
-                else:
-                    f.write("No major classes identified\n")
-                f.write("\n")
-                
-                f.write("## Core Functions\n")
-                if structure['semantic_units'].get('functions'):
-                    # Sort by return type for better organization
-                    funcs = sorted(structure['semantic_units']['functions'],
-                                 key=lambda x: (x.get('return_type', 'Any'), x.get('name', '')))[:15]  # Top 15 functions
-                    for func in funcs:
-                        ret_type = func.get('return_type', 'Any')
-                        f.write(f"- `{func['name']}` → `{ret_type}`\n")
-                else:
-                    f.write("No major functions identified\n")
-                f.write("\n")
-                
-                # Code patterns if available
-                if self.include_patterns and structure.get('patterns'):
-                    f.write("## Common Code Patterns\n")
-                    for pattern, files in structure['patterns'].items():
-                        f.write(f"- **{pattern}** - Used in {len(files)} files\n")
-                    f.write("\n")
-                
-                # Dependencies if available
-                if self.include_dependencies and structure.get('dependencies'):
-                    f.write("## External Dependencies\n")
-                    # Count and sort external dependencies
-                    ext_deps = Counter()
-                    for file_deps in structure['dependencies'].values():
-                        ext_deps.update(file_deps.get('external', []))
-                    
-                    for dep, count in ext_deps.most_common(10):  # Top 10 external dependencies
-                        f.write(f"- `{dep}` - Used in {count} files\n")
-                    f.write("\n")
+            self._write_markdown(structure, md_filename, reused)
                     
             print(f"Conversion complete. Check {json_filename} and {md_filename} for results.")
+            if self.cache is not None:
+                if reused:
+                    print("Cache: reused previous analysis of this commit")
+                else:
+                    print(f"Cache: {self.cache.hits} hits, {self.cache.misses} misses")
+                self.cache.prune()
                 
         finally:
             # Clean up temp directory if not local
             if not self.is_local and hasattr(self, 'temp_dir'):
-                shutil.rmtree(self.temp_dir)
+                self._cleanup_temp_dir()
+
+    def _cleanup_temp_dir(self) -> None:
+        """Delete the temporary clone without making convert wait for it."""
+        # Renaming is a single syscall and frees the original path immediately
+        trash_dir = self.temp_dir + '.trash'
+        try:
+            os.rename(self.temp_dir, trash_dir)
+        except OSError:
+            trash_dir = self.temp_dir
+        # Not a daemon thread: the interpreter waits for it at exit, so the clone is never left behind.
+        # Errors are ignored since there is no one left to report them to.
+        threading.Thread(target=shutil.rmtree, args=(trash_dir,), kwargs={'ignore_errors': True}).start()
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
     parser = argparse.ArgumentParser(description='Convert repository to LLM-optimized summary')
     parser.add_argument('source', nargs='?', help='GitHub repository URL or local path (optional - will prompt if not provided)')
     parser.add_argument('--local', action='store_true', help='Source is a local directory')
@@ -820,8 +1450,16 @@ def main():
     parser.add_argument('--no-types', action='store_true', help='Skip return type extraction')
     parser.add_argument('--no-deps', action='store_true', help='Skip dependency analysis')
     parser.add_argument('--no-patterns', action='store_true', help='Skip code pattern detection')
-    
-    args = parser.parse_args()
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for file analysis (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the on-disk analysis cache')
+    parser.add_argument('--compact-json', action='store_true', help='Write JSON without indentation')
+    return parser
+
+# Built once at import, so repeated main() calls from scripts reuse it
+_PARSER = _build_parser()
+
+def main(argv: Optional[List[str]] = None):
+    args = _PARSER.parse_args(argv)
     
     # If source is not provided, prompt for it
     source = args.source
@@ -833,7 +1471,7 @@ def main():
     
     # Ask if it's a local directory if not specified
     is_local = args.local
-    if not args.local and os.path.exists(source) and os.path.isdir(source):
+    if not args.local and os.path.isdir(source):
         confirm = input(f"'{source}' exists locally. Analyze as local directory? (y/n): ")
         is_local = confirm.lower() in ('y', 'yes')
     
@@ -844,7 +1482,10 @@ def main():
         include_tree=not args.no_tree,
         include_types=not args.no_types,
         include_dependencies=not args.no_deps,
-        include_patterns=not args.no_patterns
+        include_patterns=not args.no_patterns,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        compact_json=args.compact_json
     )
     
     converter.convert()